@@ -1,5 +1,3 @@
-from dotenv import load_dotenv
-
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 
@@ -8,18 +6,27 @@ import os
 # Create the SQLAlchemy instance
 db = SQLAlchemy()
 
-def create_app(testing=False):
+def create_app(testing=False, config=None):
     """
     Flask application factory function.
 
     This function initializes the Flask app, registers blueprints,
-    and returns the app instance ready to run.
+    and returns the app instance ready to run. Anything not needed to
+    build the app (dotenv, logging handlers, the task executor) is set up
+    here or on first use rather than at import time, to keep cold starts
+    cheap for short-lived workers and CLI invocations.
+
+    Args:
+        testing (bool): Use the testing configuration.
+        config (dict, optional): Settings applied on top of the loaded configuration.
 
     Returns:
         Flask app instance
     """
-    # Load environment variables
-    load_dotenv()
+    # Load environment variables, the test suite configures itself explicitly
+    if not testing:
+        from dotenv import load_dotenv
+        load_dotenv()
 
     # Create the Flask application instance
     app = Flask(__name__)
@@ -34,12 +41,27 @@ def create_app(testing=False):
     else:
         app.config.from_object('config.DevelopmentConfig')
 
+    if config:
+        app.config.update(config)
+
+    # Attach log handlers now that the log directory is known
+    from .utils.logger import configure_logging
+    configure_logging(app)
+
     # Initialize extensions
     db.init_app(app)
 
+    # Version-keyed cache for the read API payloads
+    from .utils.cache import ResultCache
+    app.extensions['result_cache'] = ResultCache(app.config['RESULT_CACHE_SIZE'])
+
     # Import and register the main blueprint that contains routes
     from .routes import main
     app.register_blueprint(main)
 
+    # Register the offline `flask` CLI commands
+    from .cli import register_commands
+    register_commands(app)
+
     # Return the fully configured Flask app
     return app
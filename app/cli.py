@@ -0,0 +1,212 @@
+# app/cli.py
+
+import time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from . import db
+
+
+def register_commands(app):
+    """
+    Registers the offline batch commands on the app's `flask` CLI group.
+    """
+    app.cli.add_command(import_transactions_command)
+    app.cli.add_command(detect_fraud_command)
+    app.cli.add_command(rebuild_summaries_command)
+    app.cli.add_command(archive_transactions_command)
+
+
+def _rate(count, elapsed):
+    return count / elapsed if elapsed > 0 else float(count)
+
+
+def _import_file(app, path, write_lock):
+    """
+    Imports a single CSV file in its own app context and database session.
+
+    Returns:
+        tuple: (path, imported_count, error_count, elapsed_seconds)
+    """
+    from .services.transaction_importer import import_transactions_from_csv
+
+    started = time.perf_counter()
+    with app.app_context():
+        try:
+            with open(path, 'rb') as file_stream:
+                success_count, error_rows = import_transactions_from_csv(
+                    file_stream, write_lock=write_lock)
+        finally:
+            db.session.remove()
+    return path, success_count, len(error_rows), time.perf_counter() - started
+
+
+def _detect_for_users(app, since, user_ids, write_lock):
+    """
+    Runs detection for a subset of users, storing the flags without the task queue.
+
+    Flags are collected while detecting, then written and committed once for
+    the whole batch.
+    """
+    from contextlib import nullcontext
+    from .services.fraud_detector import detect_fraudulent_transactions
+    from .services.fraud_detector import save_suspicious_batch
+
+    with app.app_context():
+        try:
+            payloads = []
+            count = detect_fraudulent_transactions(
+                since=since, user_ids=user_ids, handler=payloads.append)
+            with write_lock or nullcontext():
+                save_suspicious_batch(payloads)
+            return count
+        finally:
+            db.session.remove()
+
+
+@click.command('import-transactions')
+@click.argument('paths', nargs=-1, required=True,
+                type=click.Path(exists=True, dir_okay=False))
+@click.option('--workers', default=4, show_default=True, type=click.IntRange(min=1),
+              help='Number of files imported concurrently.')
+@with_appcontext
+def import_transactions_command(paths, workers):
+    """Import one or more transaction CSV files (optionally gzip/bz2/zstd) into the database.
+
+    Exits with a non-zero status if any file could not be imported.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from threading import Lock
+
+    app = current_app._get_current_object()
+    started = time.perf_counter()
+    total_imported = 0
+    total_failed = 0
+    failed_files = []
+
+    # SQLite allows a single writer, files are parsed concurrently but
+    # written one at a time instead of failing with "database is locked"
+    write_lock = Lock() if db.engine.dialect.name == 'sqlite' else None
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+        futures = {executor.submit(_import_file, app, path, write_lock): path
+                   for path in paths}
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            try:
+                path, imported, failed, elapsed = future.result()
+            except Exception as e:
+                failed_files.append(futures[future])
+                click.echo(f"[{done}/{len(paths)}] {futures[future]}: import failed: {e}", err=True)
+                continue
+
+            total_imported += imported
+            total_failed += failed
+            click.echo(
+                f"[{done}/{len(paths)}] {path}: {imported} imported, {failed} failed "
+                f"({_rate(imported, elapsed):.0f} rows/s)")
+
+    elapsed = time.perf_counter() - started
+    click.echo(
+        f"Done: {total_imported} transactions imported, {total_failed} rows failed "
+        f"in {elapsed:.2f}s ({_rate(total_imported, elapsed):.0f} rows/s)")
+
+    if failed_files:
+        raise click.ClickException(
+            f"{len(failed_files)} of {len(paths)} files failed to import: {', '.join(failed_files)}")
+
+
+@click.command('detect-fraud')
+@click.option('--since', type=click.DateTime(formats=['%Y-%m-%d %H:%M:%S', '%Y-%m-%d']),
+              default=None, help='Only flag transactions on or after this date.')
+@click.option('--workers', default=1, show_default=True, type=click.IntRange(min=1),
+              help='Number of concurrent workers, users are split between them.')
+@with_appcontext
+def detect_fraud_command(since, workers):
+    """Run fraud detection offline, storing flags directly in the database."""
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from threading import Lock
+    from .models import Transaction
+
+    app = current_app._get_current_object()
+    started = time.perf_counter()
+
+    query = db.session.query(Transaction.user_id).distinct()
+    if since is not None:
+        query = query.filter(Transaction.date >= since)
+    user_ids = [user_id for user_id, in query.order_by(Transaction.user_id)]
+
+    if not user_ids:
+        click.echo("No transactions to analyze.")
+        return
+
+    # Round-robin users over the workers, each user is handled by exactly one
+    batches = [user_ids[i::workers] for i in range(min(workers, len(user_ids)))]
+    total = 0
+
+    # SQLite allows a single writer, batches are detected concurrently but
+    # stored one at a time
+    write_lock = Lock() if db.engine.dialect.name == 'sqlite' else None
+
+    with ThreadPoolExecutor(max_workers=len(batches)) as executor:
+        futures = {executor.submit(_detect_for_users, app, since, batch, write_lock): batch
+                   for batch in batches}
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            count = future.result()
+            total += count
+            click.echo(
+                f"[{done}/{len(batches)}] {len(futures[future])} users analyzed, "
+                f"{count} suspicious transactions")
+
+    elapsed = time.perf_counter() - started
+    click.echo(
+        f"Done: {total} suspicious transactions detected for {len(user_ids)} users "
+        f"in {elapsed:.2f}s ({_rate(len(user_ids), elapsed):.0f} users/s)")
+
+
+@click.command('rebuild-summaries')
+@with_appcontext
+def rebuild_summaries_command():
+    """Recompute the per-user summary table from the transaction tables."""
+    from .services.user_summary import rebuild_user_summaries
+
+    started = time.perf_counter()
+    count = rebuild_user_summaries()
+    click.echo(f"Done: {count} user summaries rebuilt in {time.perf_counter() - started:.2f}s")
+
+
+@click.command('archive-transactions')
+@click.option('--before', required=True, type=click.DateTime(formats=['%Y-%m']),
+              help='Archive every month older than this one (YYYY-MM).')
+@click.option('--output-dir', default=None,
+              help='Directory for the Parquet files, defaults to ARCHIVE_DIR.')
+@with_appcontext
+def archive_transactions_command(before, output_dir):
+    """Export old monthly transaction partitions to Parquet and drop them."""
+    from .services.partitioning import archive_month, get_archivable_months
+
+    output_dir = output_dir or current_app.config['ARCHIVE_DIR']
+    months = get_archivable_months(before)
+
+    if not months:
+        click.echo("No transactions to archive.")
+        return
+
+    started = time.perf_counter()
+    total = 0
+
+    for done, month in enumerate(months, start=1):
+        rows, path = archive_month(month, output_dir)
+        total += rows
+        if path:
+            click.echo(f"[{done}/{len(months)}] {month:%Y-%m}: {rows} transactions -> {path}")
+        else:
+            click.echo(f"[{done}/{len(months)}] {month:%Y-%m}: empty, skipped")
+
+    elapsed = time.perf_counter() - started
+    click.echo(
+        f"Done: {total} transactions archived in {elapsed:.2f}s "
+        f"({_rate(total, elapsed):.0f} rows/s)")
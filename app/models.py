@@ -23,13 +23,17 @@ class Transaction(db.Model):
     Transaction model representing a financial transaction.
 
     Each transaction is linked to a specific user.
+
+    On PostgreSQL the table is range-partitioned by month on `date`, which is
+    why `date` is part of the primary key. Monthly partitions are created on
+    demand by `app.services.partitioning`. `transaction_id` alone stays unique.
     """
-    transaction_id = db.Column(db.Integer, primary_key=True)
+    transaction_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
     #transaction_id = db.Column(db.Integer, nullable=False)
     amount = db.Column(db.Float, nullable=False)
     currency = db.Column(db.String(10), nullable=True, default="USD")
     location_country = db.Column(db.String(100), nullable=True)
-    date = db.Column(db.DateTime, nullable=False)
+    date = db.Column(db.DateTime, primary_key=True)
 
     # Suspicion fields
     is_suspicious = db.Column(db.Boolean, default=False)
@@ -38,6 +42,18 @@ class Transaction(db.Model):
     # Foreign key to User
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
 
+    # Date-leading indexes keep month-bounded scans to the rows in the window
+    __table_args__ = (
+        db.Index('ix_transaction_date', 'date'),
+        db.Index('ix_transaction_user_date', 'user_id', 'date'),
+        # PostgreSQL cannot enforce uniqueness without the partition key, the
+        # importer checks ids there under an advisory lock. Elsewhere the
+        # database enforces it.
+        db.Index('uq_transaction_transaction_id', 'transaction_id',
+                 unique=True).ddl_if(dialect='sqlite'),
+        {'postgresql_partition_by': 'RANGE (date)'},
+    )
+
     def __repr__(self):
         return f"<Transaction {self.id} - {self.description}>"
 
@@ -51,5 +67,60 @@ class SuspiciousTransaction(db.Model):
     reason = db.Column(db.String(255), nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Composite indexes backing the keyset-paginated read API
+    __table_args__ = (
+        db.Index('ix_suspicious_user_time', 'user_id', 'timestamp', 'id'),
+        db.Index('ix_suspicious_reason_time', 'reason', 'timestamp', 'id'),
+        db.Index('ix_suspicious_time', 'timestamp', 'id'),
+    )
+
     def __repr__(self):
         return f"<SuspiciousTransaction {self.transaction_id} - {self.reason}>"
+
+class ResultsVersion(db.Model):
+    """
+    Single-row change counter for the suspicious transaction results.
+
+    Bumped in the same transaction as every stored flag. Unlike the highest
+    flag ID, it cannot go backwards when flags commit out of ID order.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ResultsVersion {self.version}>"
+
+class UserSummary(db.Model):
+    """
+    Per-user aggregates maintained incrementally by the importer and the detector.
+
+    Lets the read API answer summary requests with a single primary key lookup
+    instead of scanning the transaction tables.
+    """
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    transaction_count = db.Column(db.Integer, nullable=False, default=0)
+    total_amount = db.Column(db.Float, nullable=False, default=0.0)
+    last_country = db.Column(db.String(100), nullable=True)
+    last_transaction_at = db.Column(db.DateTime, nullable=True)
+    flag_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<UserSummary {self.user_id} - {self.transaction_count} transactions>"
+
+class ArchivedUserMonth(db.Model):
+    """
+    Per-user aggregates of a month archived out of the transaction table.
+
+    Written by archival in the same transaction that removes the rows, so that
+    rebuilt summaries keep counting archived transactions.
+    """
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    month = db.Column(db.DateTime, primary_key=True)
+    transaction_count = db.Column(db.Integer, nullable=False, default=0)
+    total_amount = db.Column(db.Float, nullable=False, default=0.0)
+    last_country = db.Column(db.String(100), nullable=True)
+    last_transaction_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<ArchivedUserMonth {self.user_id} - {self.month:%Y-%m}>"
@@ -2,16 +2,17 @@ from .services.transaction_importer import import_transactions_from_csv
 from .services.fraud_detector import detect_fraudulent_transactions
 from .services.fraud_detector import forward_to_process_fraud
 from .services.fraud_detector import save_suspicious_transactions
+from .services.result_reader import get_results_version, get_suspicious_page
+from .models import UserSummary
+from .utils.task_executor import get_task_executor
+from . import db
 
-from flask import Blueprint, render_template, request, jsonify
+from flask import Blueprint, current_app, render_template, request, jsonify
 
-from io import TextIOWrapper
-
-from concurrent.futures import ThreadPoolExecutor
-#ThreadPoolExecutor implementar
+from datetime import datetime
+from hashlib import sha1
 
 main = Blueprint('main', __name__)
-executor = ThreadPoolExecutor(max_workers=5)
 
 @main.route('/')
 def home():
@@ -26,6 +27,7 @@ def upload_file():
     GET: Renders a simple HTML form to upload a CSV file.
     POST: Processes the uploaded file, reads its content using the csv module,
           parses its content, and stores each transaction in the database.
+          The file may be plain CSV or gzip, bz2 or zstd compressed.
           Expected CSV columns:
           date, description, amount, category, payment_method, transaction_type, currency
 
@@ -41,10 +43,9 @@ def upload_file():
         if not file:
             return "No file was uploaded", 400
 
-        wrapped_file = TextIOWrapper(file, encoding='utf-8')
-
         try:
-            success_count, error_rows = import_transactions_from_csv(wrapped_file)
+            # Compressed uploads are detected and decompressed while parsing
+            success_count, error_rows = import_transactions_from_csv(file.stream)
 
             if error_rows:
                 error_msg = f"{success_count} transactions imported. {len(error_rows)} rows failed."
@@ -75,10 +76,18 @@ def detect_fraud():
     Endpoint to detect fraudulent transactions based on pre-defined rules.
     Saves suspicious transactions in the SuspiciousTransaction table.
 
+    An optional `since` query parameter ('YYYY-MM-DD HH:MM:SS') limits detection
+    to recent transactions, so only the matching months are scanned.
+
     Returns:
         JSON: Number of suspicious transactions detected.
     """
-    count = detect_fraudulent_transactions()
+    try:
+        since = _parse_date_arg(request.args.get('since'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    count = detect_fraudulent_transactions(since=since)
     return {"message": f"{count} suspicious transactions detected."}, 200
 
 
@@ -93,7 +102,7 @@ def simulate_task_queue():
         return jsonify({"error": "Invalid payload"}), 415
 
     # Dispatch asynchronously
-    executor.submit(forward_to_process_fraud, data)
+    get_task_executor().submit(forward_to_process_fraud, data)
 
     return jsonify({"message": "Task accepted and will be processed"}), 202
 
@@ -133,3 +142,131 @@ def process_fraud():
         return jsonify({"message": message}), 200
     except Exception as e:
         return jsonify({"error": f"Failed to process fraud: {str(e)}"}), 500
+
+
+
+def _make_etag(*parts):
+    return sha1("|".join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+def _conditional_json(payload, etag):
+    """
+    Builds a JSON response tagged with `etag` that clients must revalidate.
+    """
+    response = jsonify(payload)
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+
+def _not_modified(etag):
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+
+@main.route('/users/<int:user_id>/summary', methods=['GET'])
+def user_summary(user_id):
+    """
+    Returns the maintained aggregates for a single user.
+
+    Supports conditional GET: the ETag is derived from the summary row itself,
+    so a matching If-None-Match is answered with 304 after one primary key lookup.
+
+    Returns:
+        - 200 OK with the summary as JSON.
+        - 304 Not Modified if the client's copy is current.
+        - 404 Not Found if no summary exists for the user.
+    """
+    summary = db.session.get(UserSummary, user_id)
+    if not summary:
+        return jsonify({"error": f"No summary for user {user_id}"}), 404
+
+    etag = _make_etag("summary", user_id, summary.transaction_count,
+                      summary.flag_count, summary.updated_at.isoformat())
+    if etag in request.if_none_match:
+        return _not_modified(etag)
+
+    return _conditional_json({
+        "user_id": summary.user_id,
+        "transaction_count": summary.transaction_count,
+        "total_amount": summary.total_amount,
+        "last_country": summary.last_country,
+        "last_transaction_at": summary.last_transaction_at.strftime('%Y-%m-%d %H:%M:%S')
+        if summary.last_transaction_at else None,
+        "flag_count": summary.flag_count
+    }, etag)
+
+
+@main.route('/suspicious-transactions', methods=['GET'])
+def list_suspicious_transactions():
+    """
+    Lists suspicious transactions, newest first, using keyset pagination.
+
+    Query parameters (all optional):
+    - user_id (int)
+    - reason (str)
+    - since, until (str, format 'YYYY-MM-DD HH:MM:SS'), until is exclusive
+    - limit (int)
+    - cursor (str): the `next_cursor` value of the previous page
+
+    The ETag is derived from the filters and the table version, so polling
+    clients receive 304 without the page query being executed, and repeated
+    requests from different clients are served from the result cache.
+
+    Returns:
+        - 200 OK with {"items": [...], "next_cursor": str or null}.
+        - 304 Not Modified if the client's copy is current.
+        - 400 Bad Request if a parameter is invalid.
+    """
+    args = request.args
+    max_limit = current_app.config['RESULT_MAX_PAGE_SIZE']
+
+    try:
+        user_id = args.get('user_id', type=int)
+        limit = int(args.get('limit', current_app.config['RESULT_PAGE_SIZE']))
+        since = _parse_date_arg(args.get('since'))
+        until = _parse_date_arg(args.get('until'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if 'user_id' in args and user_id is None:
+        return jsonify({"error": f"Invalid user_id: {args['user_id']}"}), 400
+    if limit < 1 or limit > max_limit:
+        return jsonify({"error": f"limit must be between 1 and {max_limit}"}), 400
+
+    reason = args.get('reason')
+    cursor = args.get('cursor')
+
+    cache_key = (user_id, reason, since, until, cursor, limit)
+    version = get_results_version()
+    etag = _make_etag("suspicious", version, *cache_key)
+
+    if etag in request.if_none_match:
+        return _not_modified(etag)
+
+    cache = current_app.extensions['result_cache']
+    payload = cache.get(cache_key, version)
+
+    if payload is None:
+        try:
+            items, next_cursor = get_suspicious_page(
+                user_id=user_id, reason=reason, since=since, until=until,
+                cursor=cursor, limit=limit)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        payload = {"items": items, "next_cursor": next_cursor}
+        cache.set(cache_key, version, payload)
+
+    return _conditional_json(payload, etag)
+
+
+def _parse_date_arg(value):
+    if value is None:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        raise ValueError(f"Invalid date format: {value} (expected YYYY-MM-DD HH:MM:SS)")
@@ -5,11 +5,15 @@ from collections import defaultdict
 from ..models import Transaction, SuspiciousTransaction
 from .. import db
 from ..utils.logger import logger
+from .user_summary import increment_flag_count
+from .result_reader import bump_results_version
 
-import requests
 
+# Longest look-back window used by the rules below
+DETECTION_LOOKBACK = timedelta(minutes=5)
 
-def detect_fraudulent_transactions():
+
+def detect_fraudulent_transactions(since=None, user_ids=None, handler=None):
     """
     Detects fraudulent transactions based on multiple rules:
     1. More than 3 purchases in less than 1 minute by the same user.
@@ -17,8 +21,29 @@ def detect_fraudulent_transactions():
     3. Transactions from different countries in less than 5 minutes.
 
     Stores suspicious transactions in a separate table with the reason.
+
+    Args:
+        since (datetime, optional): Only flag transactions on or after this date.
+            Earlier transactions inside the rules' look-back window are still
+            loaded so that the time-based rules see their full history.
+        user_ids (list[int], optional): Restrict detection to these users.
+        handler (callable, optional): Called with each suspicious payload.
+            Defaults to `enqueue_fraud_simulated`, which goes through the
+            simulated task queue.
+
+    Returns:
+        int: Number of suspicious transactions detected.
     """
-    transactions = Transaction.query.order_by(
+    if handler is None:
+        handler = enqueue_fraud_simulated
+
+    query = Transaction.query
+    if since is not None:
+        query = query.filter(Transaction.date >= since - DETECTION_LOOKBACK)
+    if user_ids is not None:
+        query = query.filter(Transaction.user_id.in_(user_ids))
+
+    transactions = query.order_by(
         Transaction.user_id, Transaction.date).all()
 
     user_activity = defaultdict(list)
@@ -35,13 +60,17 @@ def detect_fraudulent_transactions():
         # Add to user history
         user_activity[user_id].append((timestamp, country, tx))
 
+        # History only, outside the requested window
+        if since is not None and timestamp < since:
+            continue
+
         # Rule 1: High frequency (more than 3 in 1 minute)
         recent_tx = get_recent_transactions(user_id, timestamp, user_activity)
         # recent_tx = [t for t in user_activity[user_id] if timestamp - t[0] <= timedelta(minutes=1)]
         if len(recent_tx) >= 3:
             count += 1
 
-            enqueue_fraud_simulated({
+            handler({
                 "user_id": user_id,
                 "transaction_id": transaction_id,
                 "date": timestamp.strftime('%Y-%m-%d %H:%M:%S'),
@@ -54,7 +83,7 @@ def detect_fraudulent_transactions():
         if amount > 5000:
             count += 1
 
-            enqueue_fraud_simulated({
+            handler({
                 "user_id": user_id,
                 "transaction_id": transaction_id,
                 "date": timestamp.strftime('%Y-%m-%d %H:%M:%S'),
@@ -68,7 +97,7 @@ def detect_fraudulent_transactions():
             if prev_country != country and abs((timestamp - prev_time).total_seconds()) <= 300:
                 count += 1
 
-                enqueue_fraud_simulated({
+                handler({
                     "user_id": user_id,
                     "transaction_id": transaction_id,
                     "date": timestamp.strftime('%Y-%m-%d %H:%M:%S'),
@@ -82,21 +111,12 @@ def detect_fraudulent_transactions():
 
 
 def enqueue_fraud_simulated(data_suspicious_transaction):
+    # Imported lazily, it is only needed when tasks are actually dispatched
+    import requests
 
     try:
         # Update the original transaction record
-        transaction = Transaction.query.get(
-            data_suspicious_transaction["transaction_id"])
-        if transaction:
-            transaction.is_suspicious = True
-            if (len(transaction.reason) > 0):
-                if (data_suspicious_transaction["reason"] in transaction.reason):
-                    pass
-                else:
-                    transaction.reason = transaction.reason + \
-                        " // "+data_suspicious_transaction["reason"]
-            else:
-                transaction.reason = data_suspicious_transaction["reason"]
+        mark_transaction_suspicious(data_suspicious_transaction)
 
         # Commit changes to the database
         db.session.commit()
@@ -118,10 +138,101 @@ def enqueue_fraud_simulated(data_suspicious_transaction):
         print(f"[Task Enqueue Error] Failed to simulate task: {e}")
 
 
+def mark_transaction_suspicious(data_suspicious_transaction):
+    """
+    Flags the original transaction record and appends the reason to it.
+
+    The caller is responsible for committing the session.
+    """
+    # Filtering on the date as well lets partitioned tables prune to one month
+    transaction = Transaction.query.filter_by(
+        transaction_id=data_suspicious_transaction["transaction_id"],
+        date=datetime.strptime(data_suspicious_transaction["date"], '%Y-%m-%d %H:%M:%S')
+    ).first()
+    if transaction:
+        _append_reason(transaction, data_suspicious_transaction["reason"])
+
+
+def _append_reason(transaction, reason):
+    transaction.is_suspicious = True
+    if transaction.reason:
+        if reason not in transaction.reason:
+            transaction.reason = transaction.reason + " // "+reason
+    else:
+        transaction.reason = reason
+
+
+def save_suspicious_batch(data_suspicious_transactions, chunk_size=500):
+    """
+    Flags and stores a batch of suspicious transactions in a single commit.
+
+    Used by offline batch detection instead of the per-flag HTTP path. The
+    original transactions and the flags already stored are loaded with one
+    query per chunk of transaction IDs, not one per flag. Flags already
+    stored, or repeated in the batch, are skipped.
+
+    Args:
+        data_suspicious_transactions (list[dict]): Payloads built by
+            `detect_fraudulent_transactions`.
+        chunk_size (int): Transaction IDs looked up per query.
+
+    Returns:
+        int: Number of suspicious transactions stored.
+    """
+    payloads = data_suspicious_transactions
+    transaction_ids = sorted({payload["transaction_id"] for payload in payloads})
+
+    transactions = {}
+    already_flagged = set()
+    for start in range(0, len(transaction_ids), chunk_size):
+        chunk = transaction_ids[start:start + chunk_size]
+        for transaction in Transaction.query.filter(Transaction.transaction_id.in_(chunk)):
+            transactions[(transaction.transaction_id, transaction.date)] = transaction
+        already_flagged.update(
+            (transaction_id, reason) for transaction_id, reason in db.session.query(
+                SuspiciousTransaction.transaction_id, SuspiciousTransaction.reason
+            ).filter(SuspiciousTransaction.transaction_id.in_(chunk)))
+
+    flags_per_user = defaultdict(int)
+    for payload in payloads:
+        parsed_date = datetime.strptime(payload["date"], '%Y-%m-%d %H:%M:%S')
+
+        transaction = transactions.get((payload["transaction_id"], parsed_date))
+        if transaction:
+            _append_reason(transaction, payload["reason"])
+
+        key = (payload["transaction_id"], payload["reason"])
+        if key in already_flagged:
+            continue
+        already_flagged.add(key)
+
+        db.session.add(SuspiciousTransaction(
+            transaction_id=payload["transaction_id"],
+            user_id=payload["user_id"],
+            reason=payload["reason"],
+            timestamp=parsed_date
+        ))
+        flags_per_user[int(payload["user_id"])] += 1
+
+    # Fixed user order, concurrent batches lock summary rows in the same order
+    for user_id, count in sorted(flags_per_user.items()):
+        increment_flag_count(user_id, count)
+    if flags_per_user:
+        bump_results_version()
+
+    db.session.commit()
+
+    stored = sum(flags_per_user.values())
+    logger.info(f"Stored {stored} suspicious transactions out of {len(payloads)} detected")
+    return stored
+
+
 def forward_to_process_fraud(data):
     """
     Sends the task payload to the /process-fraud endpoint asynchronously.
     """
+    import requests
+
     try:
         response = requests.post(
             "http://localhost:5000/process-fraud", json=data)
@@ -170,6 +281,8 @@ def save_suspicious_transactions(data_suspicious_transaction):
             reason=data_suspicious_transaction["reason"],
             timestamp=parsed_date
         ))
+        increment_flag_count(int(data_suspicious_transaction["user_id"]))
+        bump_results_version()
 
         message = "Suspicious transaction saved - Transaction ID: " + \
             str(data_suspicious_transaction["transaction_id"]) + \
@@ -0,0 +1,242 @@
+# app/services/partitioning.py
+from ..models import Transaction
+from .user_summary import record_archived_month
+from ..utils.logger import logger
+from .. import db
+
+from datetime import datetime
+import os
+
+from sqlalchemy import func, select, text
+
+# Advisory lock serializing partition creation across sessions
+PARTITION_LOCK_KEY = 7351001
+
+ARCHIVE_COLUMNS = [
+    Transaction.transaction_id,
+    Transaction.user_id,
+    Transaction.amount,
+    Transaction.currency,
+    Transaction.location_country,
+    Transaction.date,
+    Transaction.is_suspicious,
+    Transaction.reason,
+]
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1)
+
+
+def next_month(value):
+    if value.month == 12:
+        return datetime(value.year + 1, 1, 1)
+    return datetime(value.year, value.month + 1, 1)
+
+
+def iter_months(start, end):
+    """
+    Yields the first day of every month from `start`'s month up to, excluding, `end`.
+    """
+    month = month_start(start)
+    while month < end:
+        yield month
+        month = next_month(month)
+
+
+def partition_name(month):
+    return f"transaction_y{month.year:04d}m{month.month:02d}"
+
+
+def uses_native_partitions():
+    """
+    Declarative partitioning is only available on PostgreSQL. Other backends
+    keep a single table and rely on the date-leading indexes instead.
+    """
+    return db.engine.dialect.name == 'postgresql'
+
+
+def _partition_exists(connection, name):
+    return connection.execute(
+        text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None
+
+
+def ensure_partitions(dates):
+    """
+    Creates the monthly partitions needed to store transactions with these dates.
+
+    Creating a partition locks the whole `transaction` table, so it runs in its
+    own short transaction on a separate connection and is committed right away.
+    Readers are only blocked for the DDL itself, never for a whole import.
+    Call it before the session touches `transaction`, the DDL would otherwise
+    wait on the session's own locks. Existence is checked in the catalog on
+    every call, so a partition dropped by archival is simply recreated.
+    No-op on backends without native partitioning.
+
+    Args:
+        dates (iterable[datetime]): Dates of the rows about to be inserted.
+    """
+    if not uses_native_partitions():
+        return
+
+    months = sorted({month_start(date) for date in dates})
+
+    with db.engine.begin() as connection:
+        missing = [month for month in months
+                   if not _partition_exists(connection, partition_name(month))]
+        if not missing:
+            return
+
+        # Serialize creators, a concurrent import may be creating the same month.
+        # Released at commit, then re-check what is still missing.
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+
+        for month in missing:
+            name = partition_name(month)
+            if _partition_exists(connection, name):
+                continue
+
+            # Bounds are built from datetimes, never from user input
+            connection.execute(text(
+                f'CREATE TABLE IF NOT EXISTS {name} '
+                f'PARTITION OF "transaction" '
+                f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{next_month(month):%Y-%m-%d}')"
+            ))
+            logger.info(f"Created transaction partition {name}")
+
+
+def get_archivable_months(before):
+    """
+    Returns the months holding transactions strictly older than `before`.
+
+    Args:
+        before (datetime): First day of the oldest month to keep.
+    """
+    oldest = db.session.query(func.min(Transaction.date)).scalar()
+    if oldest is None or oldest >= before:
+        return []
+    return list(iter_months(oldest, before))
+
+
+def _export_month(month, path, batch_size):
+    """
+    Streams one month of transactions into a zstd compressed Parquet file.
+
+    Rows are fetched and written in batches, so a month is never fully loaded
+    in memory. The file is written under a temporary name and only moved into
+    place once complete.
+
+    Returns:
+        int: Number of exported rows. No file is written when zero.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Archiving transactions requires the 'pyarrow' package")
+
+    schema = pa.schema([
+        ('transaction_id', pa.int64()),
+        ('user_id', pa.int64()),
+        ('amount', pa.float64()),
+        ('currency', pa.string()),
+        ('location_country', pa.string()),
+        ('date', pa.timestamp('us')),
+        ('is_suspicious', pa.bool_()),
+        ('reason', pa.string()),
+    ])
+
+    result = db.session.execute(
+        select(*ARCHIVE_COLUMNS)
+        .where(Transaction.date >= month, Transaction.date < next_month(month))
+        .order_by(Transaction.date, Transaction.transaction_id)
+        .execution_options(yield_per=batch_size)
+    )
+
+    tmp_path = path + '.tmp'
+    writer = None
+    rows = 0
+
+    try:
+        for batch in result.partitions():
+            columns = list(zip(*batch))
+            table = pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, schema, compression='zstd')
+            writer.write_table(table)
+            rows += len(batch)
+    except Exception:
+        if writer is not None:
+            writer.close()
+            os.remove(tmp_path)
+        raise
+
+    if writer is not None:
+        writer.close()
+
+    if rows:
+        os.replace(tmp_path, path)
+    return rows
+
+
+def archive_month(month, output_dir, batch_size=10000):
+    """
+    Exports one month of transactions to Parquet and removes it from the hot DB.
+
+    On PostgreSQL the month's partition is locked against writes during the
+    export and then dropped. On other backends the rows are deleted, and the
+    whole operation is rolled back if the deleted count does not match the
+    exported one (e.g. a late write landed in the month meanwhile).
+
+    Per-user summaries keep their lifetime totals. The month's per-user
+    aggregates are recorded with the removal, so rebuilt summaries keep
+    counting the archived rows too.
+
+    Args:
+        month (datetime): First day of the month to archive.
+        output_dir (str): Directory receiving the Parquet files.
+        batch_size (int): Rows fetched and written per batch.
+
+    Returns:
+        tuple:
+            - int: Number of archived rows.
+            - str or None: Path of the Parquet file, None if the month was empty.
+    """
+    name = partition_name(month)
+    path = os.path.join(output_dir, f"{name}.parquet")
+    os.makedirs(output_dir, exist_ok=True)
+
+    try:
+        if uses_native_partitions():
+            if not _partition_exists(db.session, name):
+                db.session.rollback()
+                return 0, None
+            db.session.execute(text(f'LOCK TABLE {name} IN SHARE MODE'))
+
+        rows = _export_month(month, path, batch_size)
+        if rows:
+            record_archived_month(month, next_month(month))
+
+        if uses_native_partitions():
+            db.session.execute(text(f'DROP TABLE {name}'))
+        elif rows:
+            deleted = Transaction.query.filter(
+                Transaction.date >= month,
+                Transaction.date < next_month(month)
+            ).delete(synchronize_session=False)
+            if deleted != rows:
+                os.remove(path)
+                raise RuntimeError(
+                    f"{name}: exported {rows} rows but {deleted} matched on delete, aborted")
+
+        db.session.commit()
+
+    except Exception:
+        db.session.rollback()
+        raise
+
+    if rows:
+        logger.info(f"Archived {rows} transactions from {name} to {path}")
+    return rows, path if rows else None
@@ -0,0 +1,143 @@
+# app/services/result_reader.py
+from ..models import ResultsVersion, SuspiciousTransaction
+from .. import db
+
+from datetime import datetime
+import base64
+
+from sqlalchemy import and_, or_, update
+from sqlalchemy.exc import IntegrityError
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Primary key of the single ResultsVersion row
+RESULTS_VERSION_ID = 1
+
+
+def encode_cursor(timestamp, row_id):
+    """
+    Builds an opaque keyset cursor from the sort key of the last returned row.
+
+    The timestamp keeps its microseconds, rows in the same second would
+    otherwise be skipped.
+    """
+    raw = f"{timestamp.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """
+    Parses a cursor produced by `encode_cursor`.
+
+    Returns:
+        tuple: (timestamp, row_id)
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        timestamp_str, row_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(timestamp_str), int(row_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def get_results_version():
+    """
+    Returns a cheap version marker for the suspicious transaction table.
+
+    Reads the counter bumped by `bump_results_version`. This is a single
+    primary key lookup.
+    """
+    return db.session.query(ResultsVersion.version).filter_by(
+        id=RESULTS_VERSION_ID).scalar() or 0
+
+
+def bump_results_version():
+    """
+    Marks the suspicious transaction results as changed.
+
+    Must run in the same transaction as the flags it covers. The counter row
+    stays locked until commit, so a reader seeing a version also sees every
+    flag stored under it. The caller is responsible for committing the session.
+    """
+    statement = (
+        update(ResultsVersion)
+        .where(ResultsVersion.id == RESULTS_VERSION_ID)
+        .values(version=ResultsVersion.version + 1)
+    )
+
+    if db.session.execute(statement).rowcount:
+        return
+
+    # First flag ever, a concurrent session may be creating the row too
+    try:
+        with db.session.begin_nested():
+            db.session.add(ResultsVersion(id=RESULTS_VERSION_ID, version=1))
+    except IntegrityError:
+        db.session.execute(statement)
+
+
+def serialize_suspicious_transaction(suspicious):
+    return {
+        "id": suspicious.id,
+        "transaction_id": suspicious.transaction_id,
+        "user_id": suspicious.user_id,
+        "reason": suspicious.reason,
+        "timestamp": suspicious.timestamp.strftime(DATE_FORMAT)
+    }
+
+
+def get_suspicious_page(user_id=None, reason=None, since=None, until=None,
+                        cursor=None, limit=50):
+    """
+    Returns one page of suspicious transactions, newest first.
+
+    Uses keyset pagination on (timestamp, id) so every page costs the same
+    regardless of how deep the client has paged, unlike OFFSET.
+
+    Args:
+        user_id (int, optional): Only return flags for this user.
+        reason (str, optional): Only return flags with this exact reason.
+        since (datetime, optional): Inclusive lower bound on the flag timestamp.
+        until (datetime, optional): Exclusive upper bound on the flag timestamp.
+        cursor (str, optional): Cursor returned with the previous page.
+        limit (int): Maximum number of rows to return.
+
+    Returns:
+        tuple:
+            - list: Serialized suspicious transactions.
+            - str or None: Cursor for the next page, None when exhausted.
+    """
+    query = SuspiciousTransaction.query
+
+    if user_id is not None:
+        query = query.filter(SuspiciousTransaction.user_id == user_id)
+    if reason is not None:
+        query = query.filter(SuspiciousTransaction.reason == reason)
+    if since is not None:
+        query = query.filter(SuspiciousTransaction.timestamp >= since)
+    if until is not None:
+        query = query.filter(SuspiciousTransaction.timestamp < until)
+
+    if cursor is not None:
+        last_timestamp, last_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            SuspiciousTransaction.timestamp < last_timestamp,
+            and_(SuspiciousTransaction.timestamp == last_timestamp,
+                 SuspiciousTransaction.id < last_id)
+        ))
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.order_by(
+        SuspiciousTransaction.timestamp.desc(),
+        SuspiciousTransaction.id.desc()
+    ).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id)
+
+    return [serialize_suspicious_transaction(row) for row in rows], next_cursor
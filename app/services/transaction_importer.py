@@ -1,11 +1,19 @@
 # app/services/transaction_importer.py
 from ..models import Transaction
 from ..models import User
+from .user_summary import apply_imported_transactions
+from .partitioning import ensure_partitions, uses_native_partitions
+from ..utils.compression import open_text_stream
 from ..utils.logger import logger
 from .. import db
 
+from contextlib import nullcontext
 from datetime import datetime
 import csv
+import io
+
+from sqlalchemy import select, text
+from sqlalchemy.exc import IntegrityError
 
 
 def validate_transaction_row(row):
@@ -59,23 +67,117 @@ def validate_transaction_row(row):
     return True, None
 
 
-def import_transactions_from_csv(file_stream):
+def get_or_create_user(user_id):
+    """
+    Returns the user with the given ID, creating it on-the-fly if needed.
+
+    The insert runs inside a savepoint so that when several imports create the
+    same user concurrently, the loser falls back to the committed row instead
+    of failing its whole file.
+
+    Args:
+        user_id (int): The ID of the user.
+
+    Returns:
+        User: The existing or newly created user.
+    """
+    user = db.session.get(User, user_id)
+    if user:
+        return user
+
+    try:
+        with db.session.begin_nested():
+            user = User(
+                id=user_id,
+                username=f"user{user_id}",
+                email=f"user{user_id}@example.com"
+            )
+            db.session.add(user)
+        logger.info(f"Created new user with id {user_id}")
+    except IntegrityError:
+        user = db.session.get(User, user_id)
+
+    return user
+
+
+# Advisory lock serializing transaction_id checks on PostgreSQL
+TRANSACTION_ID_LOCK_KEY = 7351002
+
+
+def lock_transaction_ids():
+    """
+    Serializes transaction_id uniqueness checks until the session's transaction ends.
+
+    The partitioned PostgreSQL table cannot enforce a unique transaction_id, so
+    concurrent imports take this lock around the existence check and the
+    insert. Other backends enforce it with a unique index.
+    """
+    if not uses_native_partitions():
+        return
+    db.session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": TRANSACTION_ID_LOCK_KEY})
+
+
+def find_existing_transaction_ids(transaction_ids, chunk_size=500):
+    """
+    Returns which of the given transaction IDs are already stored, whatever their date.
+
+    Args:
+        transaction_ids (iterable): Candidate transaction IDs.
+        chunk_size (int): IDs checked per query, keeps IN lists bounded.
+
+    Returns:
+        set: The IDs that already exist.
+    """
+    transaction_ids = list(transaction_ids)
+    existing = set()
+
+    for start in range(0, len(transaction_ids), chunk_size):
+        existing.update(db.session.execute(
+            select(Transaction.transaction_id)
+            .where(Transaction.transaction_id.in_(transaction_ids[start:start + chunk_size]))
+        ).scalars())
+
+    return existing
+
+
+# Valid rows written per database transaction, bounds the rows held in memory
+IMPORT_CHUNK_SIZE = 5000
+
+
+def import_transactions_from_csv(file_stream, write_lock=None, chunk_size=IMPORT_CHUNK_SIZE):
     """
     Parses a CSV file with transactions for multiple users, validates and stores them in the database.
     If a user doesn't exist, it creates the user on-the-fly using the user_id from each row.
 
+    The file is streamed: rows are parsed and validated without touching the
+    database, and every `chunk_size` valid rows are written and committed in
+    one short transaction, so at most one chunk is held in memory. Database
+    failures abort the import and are never reported as row errors, chunks
+    committed before the failure stay imported. Rows whose transaction_id is
+    repeated in the file or already stored are rejected as row errors, so a
+    failed file can be imported again.
+
     Args:
-        file_stream (file-like object): The uploaded CSV file stream.
+        file_stream (file-like object): The uploaded CSV file stream, either text
+            or bytes. Binary streams may be gzip, bz2 or zstd compressed and are
+            decompressed on the fly while reading.
+        write_lock (context manager, optional): Held while a chunk is written,
+            lets concurrent imports parse in parallel but write one at a time.
+        chunk_size (int): Valid rows written per database transaction.
 
     Returns:
         tuple:
             - int: Number of successfully imported transactions.
             - list: Error logs in the format [(row_number, error_message, row_data)].
     """
+    if not isinstance(file_stream, io.TextIOBase):
+        file_stream = open_text_stream(file_stream)
+
     reader = csv.DictReader(file_stream)
-    transactions = []
+    chunk = []  # (row_number, row, transaction)
+    chunk_ids = set()
+    imported = 0
     error_logs = []
-    known_users = {}  # Cache of user_id to avoid duplicate DB checks
 
     for idx, row in enumerate(reader, start=1):
         # Validate row
@@ -91,19 +193,6 @@ def import_transactions_from_csv(file_stream):
             date_str = row['timestamp']
             parsed_date = datetime.strptime(date_str, '%Y-%m-%d %H:%M:%S')
 
-            # Check if user is already known/created in this session
-            if user_id not in known_users:
-                user = db.session.get(User, user_id)
-                if not user:
-                    user = User(
-                        id=user_id,
-                        username=f"user{user_id}",
-                        email=f"user{user_id}@example.com"
-                    )
-                    db.session.add(user)
-                    logger.info(f"Created new user with id {user_id}")
-                known_users[user_id] = user  # Cache user
-
             # Create transaction
             transaction = Transaction(
                 transaction_id=float(row['transaction_id']),
@@ -115,18 +204,72 @@ def import_transactions_from_csv(file_stream):
                 is_suspicious=bool(row['is_suspicious']),
                 reason=row.get('reason')
             )
-            transactions.append(transaction)
+
+            # Repeats in earlier chunks are already stored and rejected on write
+            if transaction.transaction_id in chunk_ids:
+                msg = f"Duplicate transaction_id in file: {row['transaction_id']}"
+                logger.warning(f"[Row {idx}] {msg} — Data: {row}")
+                error_logs.append((idx, msg, row))
+                continue
+
+            chunk_ids.add(transaction.transaction_id)
+            chunk.append((idx, row, transaction))
 
         except Exception as e:
             msg = f"Unexpected error: {e}"
             logger.error(f"[Row {idx}] {msg} — Data: {row}")
             error_logs.append((idx, msg, row))
+            continue
 
-    try:
-        db.session.add_all(transactions)
-        db.session.commit()
-        return len(transactions), error_logs
+        if len(chunk) >= chunk_size:
+            imported += _write_chunk(chunk, error_logs, write_lock)
+            chunk = []
+            chunk_ids = set()
+
+    if chunk:
+        imported += _write_chunk(chunk, error_logs, write_lock)
+
+    error_logs.sort(key=lambda error: error[0])
+    return imported, error_logs
+
+
+def _write_chunk(parsed, error_logs, write_lock):
+    """
+    Stores one chunk of parsed rows and commits it.
+
+    Rows whose transaction_id already exists are appended to `error_logs`.
+
+    Returns:
+        int: Number of transactions written.
+    """
+    with write_lock or nullcontext():
+        try:
+            # Committed on their own, before this import holds any lock on the table
+            ensure_partitions(tx.date for _, _, tx in parsed)
+
+            # Transaction IDs are unique regardless of the date, the lock is
+            # held until commit so concurrent imports cannot both pass the check
+            lock_transaction_ids()
+            existing_ids = find_existing_transaction_ids(tx.transaction_id for _, _, tx in parsed)
+            transactions = []
+            for idx, row, transaction in parsed:
+                if transaction.transaction_id in existing_ids:
+                    msg = f"Transaction already exists: {row['transaction_id']}"
+                    logger.warning(f"[Row {idx}] {msg} — Data: {row}")
+                    error_logs.append((idx, msg, row))
+                else:
+                    transactions.append(transaction)
+
+            # Create missing users once per distinct user_id
+            for user_id in sorted({tx.user_id for tx in transactions}):
+                get_or_create_user(user_id)
+
+            db.session.add_all(transactions)
+            apply_imported_transactions(transactions)
+            db.session.commit()
+
+        except Exception as e:
+            db.session.rollback()
+            raise RuntimeError(f"Database commit failed: {e}")
 
-    except Exception as e:
-        db.session.rollback()
-        raise RuntimeError(f"Database commit failed: {e}")
+    return len(transactions)
@@ -0,0 +1,243 @@
+# app/services/user_summary.py
+from ..models import ArchivedUserMonth, SuspiciousTransaction, Transaction, UserSummary
+from .. import db
+
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import and_, case, delete, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+
+def apply_imported_transactions(transactions):
+    """
+    Folds a batch of newly imported transactions into the per-user summary table.
+
+    Existing summaries are updated with a single atomic UPDATE per user so that
+    concurrent imports never lose increments. Missing summaries are created.
+    The caller is responsible for committing the session.
+
+    Args:
+        transactions (list[Transaction]): Transactions added in the current session.
+    """
+    by_user = defaultdict(list)
+    for tx in transactions:
+        by_user[tx.user_id].append(tx)
+
+    now = datetime.utcnow()
+
+    # Fixed user order, concurrent imports then lock summary rows in the same
+    # order and cannot deadlock each other
+    for user_id, user_transactions in sorted(by_user.items()):
+        count = len(user_transactions)
+        total = sum(tx.amount for tx in user_transactions)
+        latest = max(user_transactions, key=lambda tx: tx.date)
+
+        # Only move "last country" forward in time, imports may arrive out of order
+        is_newer = or_(
+            UserSummary.last_transaction_at.is_(None),
+            UserSummary.last_transaction_at <= latest.date
+        )
+
+        statement = (
+            update(UserSummary)
+            .where(UserSummary.user_id == user_id)
+            .values(
+                transaction_count=UserSummary.transaction_count + count,
+                total_amount=UserSummary.total_amount + total,
+                last_country=case(
+                    (is_newer, latest.location_country),
+                    else_=UserSummary.last_country),
+                last_transaction_at=case(
+                    (is_newer, latest.date),
+                    else_=UserSummary.last_transaction_at),
+                updated_at=now
+            )
+        )
+
+        _update_or_insert(statement, UserSummary(
+            user_id=user_id,
+            transaction_count=count,
+            total_amount=total,
+            last_country=latest.location_country,
+            last_transaction_at=latest.date,
+            flag_count=0,
+            updated_at=now
+        ))
+
+
+def increment_flag_count(user_id, count=1):
+    """
+    Records newly stored suspicious transactions in the user's summary.
+
+    The caller is responsible for committing the session.
+
+    Args:
+        user_id (int): The ID of the flagged user.
+        count (int): Number of flags stored for the user.
+    """
+    now = datetime.utcnow()
+
+    statement = (
+        update(UserSummary)
+        .where(UserSummary.user_id == user_id)
+        .values(flag_count=UserSummary.flag_count + count, updated_at=now)
+    )
+
+    _update_or_insert(statement, UserSummary(
+        user_id=user_id,
+        transaction_count=0,
+        total_amount=0.0,
+        flag_count=count,
+        updated_at=now
+    ))
+
+
+def _update_or_insert(statement, summary):
+    """
+    Applies an increment `statement` to an existing summary, or inserts `summary`.
+
+    The insert runs inside a savepoint. If a concurrent session created the row
+    first, the savepoint is rolled back and the increment is applied to that row
+    instead of failing the caller's whole transaction.
+    """
+    if db.session.execute(statement).rowcount:
+        return
+
+    try:
+        with db.session.begin_nested():
+            db.session.add(summary)
+    except IntegrityError:
+        db.session.execute(statement)
+
+
+def _aggregate_transactions(*criteria):
+    """
+    Aggregates the stored transactions matching `criteria` per user.
+
+    Returns:
+        list: Rows with user_id, transaction_count, total_amount,
+        last_transaction_at and last_country.
+    """
+    totals = (
+        select(
+            Transaction.user_id,
+            func.count().label('transaction_count'),
+            func.sum(Transaction.amount).label('total_amount'),
+            func.max(Transaction.date).label('last_transaction_at')
+        )
+        .where(*criteria)
+        .group_by(Transaction.user_id)
+        .subquery()
+    )
+
+    # Country of each user's latest transaction
+    return db.session.execute(
+        select(
+            totals,
+            func.max(Transaction.location_country).label('last_country')
+        )
+        .join(Transaction, and_(
+            Transaction.user_id == totals.c.user_id,
+            Transaction.date == totals.c.last_transaction_at))
+        .group_by(*totals.c)
+    ).all()
+
+
+def record_archived_month(month, end):
+    """
+    Keeps the per-user totals of a month about to be archived.
+
+    Aggregates the transactions dated in [month, end) into `ArchivedUserMonth`,
+    adding to an earlier archive of the same month, so `rebuild_user_summaries`
+    still counts them once the rows are gone. Must run in the transaction that
+    removes the rows. The caller is responsible for committing the session.
+
+    Args:
+        month (datetime): First day of the archived month.
+        end (datetime): First day of the following month.
+    """
+    archived = {
+        row.user_id: row
+        for row in ArchivedUserMonth.query.filter_by(month=month)
+    }
+
+    for row in _aggregate_transactions(Transaction.date >= month, Transaction.date < end):
+        previous = archived.get(row.user_id)
+        if previous is None:
+            db.session.add(ArchivedUserMonth(
+                user_id=row.user_id,
+                month=month,
+                transaction_count=row.transaction_count,
+                total_amount=row.total_amount,
+                last_country=row.last_country,
+                last_transaction_at=row.last_transaction_at
+            ))
+            continue
+
+        previous.transaction_count += row.transaction_count
+        previous.total_amount += row.total_amount
+        if previous.last_transaction_at is None or row.last_transaction_at >= previous.last_transaction_at:
+            previous.last_country = row.last_country
+            previous.last_transaction_at = row.last_transaction_at
+
+
+def rebuild_user_summaries():
+    """
+    Recomputes every user summary from the transaction tables.
+
+    Used to backfill the summary table on databases that predate it, or to
+    repair it. Runs one aggregate query per source table and replaces all
+    summary rows in a single transaction. Archived months are folded in from
+    `ArchivedUserMonth`, so totals stay lifetime totals like the incrementally
+    maintained ones.
+
+    Returns:
+        int: Number of summaries written.
+    """
+    now = datetime.utcnow()
+    rows = {}
+
+    def fold(user_id, count, total, last_transaction_at, last_country):
+        summary = rows.setdefault(user_id, {
+            "user_id": user_id,
+            "transaction_count": 0,
+            "total_amount": 0.0,
+            "last_country": None,
+            "last_transaction_at": None,
+            "flag_count": 0,
+            "updated_at": now
+        })
+        summary["transaction_count"] += count
+        summary["total_amount"] += total
+        if last_transaction_at is not None and (
+                summary["last_transaction_at"] is None
+                or last_transaction_at > summary["last_transaction_at"]):
+            summary["last_country"] = last_country
+            summary["last_transaction_at"] = last_transaction_at
+
+    for row in _aggregate_transactions():
+        fold(row.user_id, row.transaction_count, row.total_amount,
+             row.last_transaction_at, row.last_country)
+
+    for archived in db.session.execute(select(ArchivedUserMonth)).scalars():
+        fold(archived.user_id, archived.transaction_count, archived.total_amount,
+             archived.last_transaction_at, archived.last_country)
+
+    # Flagged users without any transaction are kept too
+    for user_id, flag_count in db.session.execute(
+            select(SuspiciousTransaction.user_id, func.count())
+            .group_by(SuspiciousTransaction.user_id)):
+        fold(user_id, 0, 0.0, None, None)
+        rows[user_id]["flag_count"] = flag_count
+
+    try:
+        db.session.execute(delete(UserSummary))
+        if rows:
+            db.session.execute(insert(UserSummary), list(rows.values()))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return len(rows)
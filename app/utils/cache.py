@@ -0,0 +1,33 @@
+# app/utils/cache.py
+
+from collections import OrderedDict
+from threading import Lock
+
+
+class ResultCache:
+    """
+    Small thread-safe LRU cache for read API payloads.
+
+    Each entry is stored together with the data version it was computed from,
+    so a lookup only hits when the underlying data has not changed since.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, version, value):
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
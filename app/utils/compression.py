@@ -0,0 +1,80 @@
+# app/utils/compression.py
+
+import bz2
+import gzip
+import io
+
+# Leading bytes identifying each supported compression format
+GZIP_MAGIC = b'\x1f\x8b'
+BZ2_MAGIC = b'BZh'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+def detect_compression(head):
+    """
+    Identifies the compression format from the first bytes of a stream.
+
+    Returns:
+        str or None: 'gzip', 'bz2', 'zstd', or None for uncompressed data.
+    """
+    if head.startswith(GZIP_MAGIC):
+        return 'gzip'
+    if head.startswith(BZ2_MAGIC):
+        return 'bz2'
+    if head.startswith(ZSTD_MAGIC):
+        return 'zstd'
+    return None
+
+
+def _peek(binary_stream, size):
+    """
+    Reads the first `size` bytes without consuming them.
+
+    Returns:
+        tuple: (stream to keep reading from, leading bytes)
+    """
+    if hasattr(binary_stream, 'seekable') and binary_stream.seekable():
+        position = binary_stream.tell()
+        head = binary_stream.read(size)
+        binary_stream.seek(position)
+        return binary_stream, head
+
+    if not hasattr(binary_stream, 'peek'):
+        binary_stream = io.BufferedReader(binary_stream)
+    return binary_stream, binary_stream.peek(size)[:size]
+
+
+def _zstd_reader(binary_stream):
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("zstd compressed input requires the 'zstandard' package")
+    return zstandard.ZstdDecompressor().stream_reader(binary_stream, closefd=False)
+
+
+def open_text_stream(binary_stream, encoding='utf-8'):
+    """
+    Wraps a binary stream in a text stream, decompressing it on the fly.
+
+    The format is detected from magic bytes, not from the file name. Data is
+    decompressed incrementally as the caller reads, so the uncompressed
+    content is never fully buffered in memory.
+
+    Args:
+        binary_stream (file-like object): Raw, possibly compressed, bytes.
+        encoding (str): Encoding of the uncompressed text.
+
+    Returns:
+        io.TextIOWrapper: A text stream suitable for csv.reader.
+    """
+    binary_stream, head = _peek(binary_stream, len(ZSTD_MAGIC))
+    compression = detect_compression(head)
+
+    if compression == 'gzip':
+        binary_stream = gzip.GzipFile(fileobj=binary_stream, mode='rb')
+    elif compression == 'bz2':
+        binary_stream = bz2.BZ2File(binary_stream, mode='rb')
+    elif compression == 'zstd':
+        binary_stream = _zstd_reader(binary_stream)
+
+    return io.TextIOWrapper(binary_stream, encoding=encoding, newline='')
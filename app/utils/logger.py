@@ -3,21 +3,34 @@
 import logging
 import os
 
-# Create logs directory if not exists
-os.makedirs('logs', exist_ok=True)
-
-# Set up the logger
+# Set up the logger, handlers are attached by configure_logging()
 logger = logging.getLogger('transaction_importer')
 logger.setLevel(logging.INFO)
 
-# File handler
-file_handler = logging.FileHandler('logs/transaction_import.log')
-file_handler.setLevel(logging.INFO)
 
-# Formatter
-formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
-file_handler.setFormatter(formatter)
+def configure_logging(app):
+    """
+    Attaches the file handler to the shared logger.
+
+    Called from the application factory instead of at import time, so that
+    importing the package does not touch the filesystem. The log file itself
+    is only opened on the first emitted record.
+    """
+    # Add handler to logger (only once)
+    if logger.handlers:
+        return
+
+    # Create logs directory if not exists
+    log_dir = app.config['LOG_DIR']
+    os.makedirs(log_dir, exist_ok=True)
+
+    # File handler
+    file_handler = logging.FileHandler(
+        os.path.join(log_dir, 'transaction_import.log'), delay=True)
+    file_handler.setLevel(logging.INFO)
+
+    # Formatter
+    formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
+    file_handler.setFormatter(formatter)
 
-# Add handler to logger (only once)
-if not logger.hasHandlers():
     logger.addHandler(file_handler)
@@ -0,0 +1,43 @@
+# app/utils/task_executor.py
+
+from threading import Lock
+
+from flask import current_app
+
+import atexit
+
+_lock = Lock()
+
+
+def get_task_executor():
+    """
+    Returns the thread pool used to dispatch simulated tasks for the current app.
+
+    The pool is created on first use rather than at import time, so processes
+    that never dispatch a task (CLI commands, short-lived workers) never start
+    it. It is shut down when the interpreter exits.
+    """
+    app = current_app._get_current_object()
+    executor = app.extensions.get('task_executor')
+
+    if executor is None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with _lock:
+            executor = app.extensions.get('task_executor')
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=app.config['TASK_EXECUTOR_WORKERS'])
+                app.extensions['task_executor'] = executor
+                atexit.register(shutdown_task_executor, app)
+
+    return executor
+
+
+def shutdown_task_executor(app):
+    """
+    Waits for pending tasks and stops the app's thread pool, if one was started.
+    """
+    executor = app.extensions.pop('task_executor', None)
+    if executor is not None:
+        executor.shutdown(wait=True)
@@ -0,0 +1,95 @@
+# benchmarks/bench_compressed_import.py
+"""
+Compares CSV import throughput for uncompressed and compressed input.
+
+For each format it reports:
+- parse: decompression + csv parsing only, with the peak Python memory used
+- import: the full import_transactions_from_csv path into an in-memory DB,
+  timed on one run and traced for peak Python memory on a second one, as
+  tracing slows it down. Rows are written in chunks, so the import peak
+  should not grow with the number of rows.
+
+Usage:
+    python benchmarks/bench_compressed_import.py [rows]
+"""
+
+import bz2
+import csv
+import gzip
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import zstandard
+
+from app import create_app, db
+from app.services.transaction_importer import import_transactions_from_csv
+from app.utils.compression import open_text_stream
+
+COMPRESSORS = {
+    'none': lambda data: data,
+    'gzip': gzip.compress,
+    'bz2': bz2.compress,
+    'zstd': zstandard.ZstdCompressor().compress,
+}
+
+
+def build_csv(rows):
+    lines = ["transaction_id,amount,currency,country,timestamp,user_id,is_suspicious,reason"]
+    for i in range(rows):
+        lines.append(f"{i + 1},{(i % 7000) + 0.5},USD,{'USA' if i % 3 else 'COL'},"
+                     f"2023-01-01 {(i // 3600) % 24:02d}:{(i // 60) % 60:02d}:{i % 60:02d},{i % 500},,")
+    return ("\n".join(lines) + "\n").encode('utf-8')
+
+
+def bench_parse(payload):
+    tracemalloc.start()
+    started = time.perf_counter()
+    rows = sum(1 for _ in csv.DictReader(open_text_stream(io.BytesIO(payload))))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows, elapsed, peak
+
+
+def bench_import(app, payload, traced=False):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        if traced:
+            tracemalloc.start()
+        started = time.perf_counter()
+        imported, _ = import_transactions_from_csv(io.BytesIO(payload))
+        elapsed = time.perf_counter() - started
+        peak = 0
+        if traced:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        return imported, elapsed, peak
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    raw = build_csv(rows)
+    app = create_app(testing=True)
+
+    print(f"{rows} rows, {len(raw) / 1e6:.1f} MB uncompressed")
+    print(f"{'format':<6} {'size MB':>8} {'parse rows/s':>13} {'peak MB':>8} "
+          f"{'import rows/s':>14} {'peak MB':>8}")
+
+    for name, compress in COMPRESSORS.items():
+        payload = compress(raw)
+        parsed, parse_elapsed, parse_peak = bench_parse(payload)
+        imported, import_elapsed, _ = bench_import(app, payload)
+        _, _, import_peak = bench_import(app, payload, traced=True)
+        assert parsed == imported == rows
+        print(f"{name:<6} {len(payload) / 1e6:>8.2f} {parsed / parse_elapsed:>13.0f} "
+              f"{parse_peak / 1e6:>8.2f} {imported / import_elapsed:>14.0f} {import_peak / 1e6:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
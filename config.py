@@ -1,6 +1,7 @@
 # config.py
 
 import os
+import tempfile
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 
@@ -8,6 +9,12 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY', 'default_key')
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', 256))
+    RESULT_PAGE_SIZE = 50
+    RESULT_MAX_PAGE_SIZE = 500
+    LOG_DIR = os.environ.get('LOG_DIR', 'logs')
+    TASK_EXECUTOR_WORKERS = 5
+    ARCHIVE_DIR = os.environ.get('ARCHIVE_DIR', 'archive')
     DEBUG = False
     TESTING = False
 
@@ -22,3 +29,4 @@ class TestingConfig(Config):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    LOG_DIR = os.path.join(tempfile.gettempdir(), 'techtest-flask-logs')
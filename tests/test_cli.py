@@ -0,0 +1,254 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # optional, only needed for archiving
+    pq = None
+
+from app import create_app, db
+from app.models import ArchivedUserMonth, SuspiciousTransaction, Transaction, User, UserSummary
+
+CSV_HEADER = "transaction_id,amount,currency,country,timestamp,user_id,is_suspicious,reason\n"
+
+
+class CliCommandsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        # File backed, commands use one connection per worker thread
+        database_path = os.path.join(self.tmpdir.name, 'test.db')
+        self.app = create_app(testing=True, config={
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database_path}'
+        })
+        self.runner = self.app.test_cli_runner()
+
+        with self.app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+            db.engine.dispose()
+        self.tmpdir.cleanup()
+
+    def _write_csv(self, name, rows):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(CSV_HEADER + "".join(rows))
+        return path
+
+    def test_import_transactions_multiple_files(self):
+        """Should import every file and report the totals"""
+        first = self._write_csv('first.csv', [
+            "1,100.00,USD,USA,2023-01-01 10:00:00,1,,\n",
+            "2,200.00,USD,USA,2023-01-01 10:05:00,1,,\n",
+        ])
+        second = self._write_csv('second.csv', [
+            "3,300.00,USD,COL,2023-01-01 10:00:00,2,,\n",
+            "4,INVALID,USD,COL,2023-01-01 10:01:00,2,,\n",
+        ])
+
+        result = self.runner.invoke(args=['import-transactions', first, second])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Done: 3 transactions imported, 1 rows failed", result.output)
+        with self.app.app_context():
+            self.assertEqual(Transaction.query.count(), 3)
+            self.assertEqual(db.session.get(UserSummary, 1).transaction_count, 2)
+
+    def test_import_transactions_concurrent_shared_users(self):
+        """Concurrent imports touching the same users should all succeed"""
+        paths = [
+            self._write_csv(f'part{f}.csv', [
+                f"{f * 100000 + i},10.00,USD,USA,2023-01-01 10:{i % 60:02d}:00,{i % 20},,\n"
+                for i in range(2000)
+            ])
+            for f in range(4)
+        ]
+
+        result = self.runner.invoke(args=['import-transactions', *paths, '--workers', '4'])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Done: 8000 transactions imported, 0 rows failed", result.output)
+        with self.app.app_context():
+            self.assertEqual(Transaction.query.count(), 8000)
+            self.assertEqual(User.query.count(), 20)
+            self.assertEqual(
+                sum(summary.transaction_count for summary in UserSummary.query.all()), 8000)
+
+    def test_import_transactions_failed_file_exits_non_zero(self):
+        """A file that fails to import should make the command fail"""
+        first = self._write_csv('first.csv', ["1,10.00,USD,USA,2023-01-01 10:00:00,1,,\n"])
+        corrupt = os.path.join(self.tmpdir.name, 'corrupt.csv.gz')
+        with open(corrupt, 'wb') as f:
+            f.write(b"\x1f\x8b" + b"not really gzip" * 10)
+
+        result = self.runner.invoke(args=['import-transactions', first, corrupt])
+
+        self.assertEqual(result.exit_code, 1, result.output)
+        self.assertIn("Done: 1 transactions imported", result.output)
+        self.assertIn("1 of 2 files failed to import", result.output)
+
+    def test_import_transactions_requires_existing_path(self):
+        """Should reject missing files before importing anything"""
+        result = self.runner.invoke(args=['import-transactions', '/does/not/exist.csv'])
+        self.assertNotEqual(result.exit_code, 0)
+
+    def test_detect_fraud_records_directly(self):
+        """Should store flags without going through the HTTP task queue"""
+        path = self._write_csv('fraud.csv', [
+            "1,6000.00,USD,USA,2023-01-01 10:00:00,1,,\n",
+            "2,10.00,USD,USA,2023-01-02 10:00:00,2,,\n",
+            "3,10.00,USD,COL,2023-01-02 10:01:00,2,,\n",
+        ])
+        self.runner.invoke(args=['import-transactions', path])
+
+        result = self.runner.invoke(args=['detect-fraud', '--workers', '2'])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Done: 2 suspicious transactions detected for 2 users", result.output)
+        with self.app.app_context():
+            self.assertEqual(SuspiciousTransaction.query.count(), 2)
+            self.assertTrue(Transaction.query.filter_by(transaction_id=1).first().is_suspicious)
+            self.assertEqual(db.session.get(UserSummary, 2).flag_count, 1)
+
+    def test_detect_fraud_rerun_skips_stored_flags(self):
+        """A second run should not store or count the same flags again"""
+        path = self._write_csv('fraud.csv', [
+            f"{i},{6000 if i % 2 else 10}.00,USD,{'USA' if i % 3 else 'COL'},"
+            f"2023-01-01 10:{i:02d}:00,{i % 4},,\n"
+            for i in range(1, 41)
+        ])
+        self.runner.invoke(args=['import-transactions', path])
+
+        first = self.runner.invoke(args=['detect-fraud', '--workers', '3'])
+        with self.app.app_context():
+            stored = SuspiciousTransaction.query.count()
+            flag_counts = {s.user_id: s.flag_count for s in UserSummary.query.all()}
+            reasons = {tx.transaction_id: tx.reason for tx in Transaction.query.all()}
+
+        second = self.runner.invoke(args=['detect-fraud', '--workers', '3'])
+
+        self.assertEqual(first.exit_code, 0, first.output)
+        self.assertEqual(second.exit_code, 0, second.output)
+        self.assertGreater(stored, 20)
+        with self.app.app_context():
+            self.assertEqual(SuspiciousTransaction.query.count(), stored)
+            self.assertEqual(sum(flag_counts.values()), stored)
+            self.assertEqual({s.user_id: s.flag_count for s in UserSummary.query.all()}, flag_counts)
+            self.assertEqual({tx.transaction_id: tx.reason for tx in Transaction.query.all()}, reasons)
+
+    def test_detect_fraud_since(self):
+        """Should only flag transactions inside the window, using earlier ones as history"""
+        path = self._write_csv('fraud.csv', [
+            "1,6000.00,USD,USA,2023-01-01 10:00:00,1,,\n",
+            "2,10.00,USD,USA,2023-01-02 09:59:00,1,,\n",
+            "3,10.00,USD,COL,2023-01-02 10:01:00,1,,\n",
+        ])
+        self.runner.invoke(args=['import-transactions', path])
+
+        result = self.runner.invoke(args=['detect-fraud', '--since', '2023-01-02 10:00:00'])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        with self.app.app_context():
+            flagged = [s.transaction_id for s in SuspiciousTransaction.query.all()]
+            self.assertEqual(flagged, [3])
+
+    def test_rebuild_summaries(self):
+        """Should backfill summaries for data stored before the table existed"""
+        with self.app.app_context():
+            db.session.add(User(id=1, username="user1", email="user1@example.com"))
+            db.session.add_all([
+                Transaction(transaction_id=1, user_id=1, amount=10.0, location_country="USA",
+                            date=datetime(2023, 1, 1, 10, 0)),
+                Transaction(transaction_id=2, user_id=1, amount=15.0, location_country="COL",
+                            date=datetime(2023, 1, 2, 10, 0)),
+                SuspiciousTransaction(transaction_id=2, user_id=1, reason="Test reason",
+                                      timestamp=datetime(2023, 1, 2, 10, 0)),
+                # Stale row from before the rebuild
+                UserSummary(user_id=1, transaction_count=99, total_amount=0.0, flag_count=0),
+            ])
+            db.session.commit()
+
+        result = self.runner.invoke(args=['rebuild-summaries'])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Done: 1 user summaries rebuilt", result.output)
+        with self.app.app_context():
+            summary = db.session.get(UserSummary, 1)
+            self.assertEqual(summary.transaction_count, 2)
+            self.assertEqual(summary.total_amount, 25.0)
+            self.assertEqual(summary.last_country, "COL")
+            self.assertEqual(summary.flag_count, 1)
+
+    @unittest.skipIf(pq is None, "pyarrow is not installed")
+    def test_archive_transactions(self):
+        """Should export old months to Parquet and remove them from the DB"""
+        path = self._write_csv('history.csv', [
+            "1,10.00,USD,USA,2023-01-15 10:00:00,1,,\n",
+            "2,20.00,USD,USA,2023-01-31 23:59:59,1,,\n",
+            "3,30.00,USD,COL,2023-03-01 00:00:00,2,,\n",
+            "4,40.00,USD,COL,2023-04-01 00:00:00,2,,\n",
+        ])
+        self.runner.invoke(args=['import-transactions', path])
+        output_dir = os.path.join(self.tmpdir.name, 'archive')
+
+        result = self.runner.invoke(args=[
+            'archive-transactions', '--before', '2023-04', '--output-dir', output_dir])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("2023-02: empty, skipped", result.output)
+        self.assertIn("Done: 3 transactions archived", result.output)
+
+        january = pq.read_table(os.path.join(output_dir, 'transaction_y2023m01.parquet'))
+        self.assertEqual(january.column('transaction_id').to_pylist(), [1, 2])
+        self.assertEqual(january.column('amount').to_pylist(), [10.0, 20.0])
+        self.assertFalse(os.path.exists(os.path.join(output_dir, 'transaction_y2023m02.parquet')))
+
+        with self.app.app_context():
+            remaining = [tx.transaction_id for tx in Transaction.query.all()]
+            self.assertEqual(remaining, [4])
+            # Summaries keep lifetime totals
+            self.assertEqual(db.session.get(UserSummary, 1).transaction_count, 2)
+
+    @unittest.skipIf(pq is None, "pyarrow is not installed")
+    def test_archive_then_rebuild_keeps_lifetime_totals(self):
+        """Rebuilt summaries should still count archived months"""
+        path = self._write_csv('history.csv', [
+            "1,10.00,USD,USA,2023-01-15 10:00:00,1,,\n",
+            "2,20.00,USD,BRA,2023-01-31 23:59:59,1,,\n",
+            "3,30.00,USD,COL,2023-03-01 00:00:00,2,,\n",
+            "4,40.00,USD,COL,2023-04-01 00:00:00,2,,\n",
+        ])
+        self.runner.invoke(args=['import-transactions', path])
+        output_dir = os.path.join(self.tmpdir.name, 'archive')
+        self.runner.invoke(args=[
+            'archive-transactions', '--before', '2023-04', '--output-dir', output_dir])
+
+        # A late row for an archived month, archived again
+        late = self._write_csv('late.csv', ["5,5.00,USD,ARG,2023-01-20 10:00:00,1,,\n"])
+        self.runner.invoke(args=['import-transactions', late])
+        self.runner.invoke(args=[
+            'archive-transactions', '--before', '2023-04', '--output-dir', output_dir])
+
+        with self.app.app_context():
+            before = {s.user_id: (s.transaction_count, s.total_amount, s.last_country)
+                      for s in UserSummary.query.all()}
+            self.assertEqual(db.session.get(
+                ArchivedUserMonth, (1, datetime(2023, 1, 1))).transaction_count, 3)
+
+        result = self.runner.invoke(args=['rebuild-summaries'])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        with self.app.app_context():
+            after = {s.user_id: (s.transaction_count, s.total_amount, s.last_country)
+                     for s in UserSummary.query.all()}
+        self.assertEqual(before, {1: (3, 35.0, "BRA"), 2: (2, 70.0, "COL")})
+        self.assertEqual(after, before)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,229 @@
+import io
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from sqlalchemy import text
+
+from app import create_app, db
+from app.models import Transaction, UserSummary
+from app.services.transaction_importer import TRANSACTION_ID_LOCK_KEY
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:  # optional, only needed for archiving
+    pyarrow = None
+
+# Partitioning is PostgreSQL only, e.g.
+# TEST_POSTGRES_URL=postgresql://postgres@localhost:5432/postgres
+POSTGRES_URL = os.environ.get('TEST_POSTGRES_URL')
+
+CSV_HEADER = b"transaction_id,amount,currency,country,timestamp,user_id,is_suspicious,reason\n"
+
+
+@unittest.skipUnless(POSTGRES_URL, "TEST_POSTGRES_URL is not set")
+class PostgresPartitioningTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(testing=True, config={
+            'SQLALCHEMY_DATABASE_URI': POSTGRES_URL,
+            # Fail fast instead of hanging if the import ever waits on its own locks
+            'SQLALCHEMY_ENGINE_OPTIONS': {'connect_args': {'options': '-c lock_timeout=5000'}},
+        })
+        self.client = self.app.test_client()
+        self.runner = self.app.test_cli_runner()
+
+        with self.app.app_context():
+            db.drop_all()
+            db.create_all()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+            db.engine.dispose()
+
+    def _upload(self, content):
+        data = {'file': (io.BytesIO(CSV_HEADER + content), 'transactions.csv')}
+        return self.client.post('/upload', data=data, content_type='multipart/form-data')
+
+    def _partitions(self):
+        with self.app.app_context():
+            return sorted(db.session.execute(text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = '\"transaction\"'::regclass"
+            )).scalars())
+
+    def test_import_creates_monthly_partitions(self):
+        """A new user in a new month should import without waiting on locks"""
+        response = self._upload(
+            b"1,10.00,USD,USA,2023-01-15 10:00:00,1,,\n"
+            b"2,20.00,USD,COL,2023-02-01 00:00:00,1,,\n"
+        )
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self._partitions(), ['transaction_y2023m01', 'transaction_y2023m02'])
+
+        with self.app.app_context():
+            self.assertEqual(db.session.get(UserSummary, 1).transaction_count, 2)
+
+    def test_new_partition_does_not_block_readers_during_import(self):
+        """A new month should be committed before the import writes, readers keep going"""
+        with self.app.app_context():
+            holder = db.engine.connect()
+        # Stalls the import right after its partitions are created
+        holder.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": TRANSACTION_ID_LOCK_KEY})
+
+        responses = []
+        upload = threading.Thread(target=lambda: responses.append(
+            self._upload(b"1,10.00,USD,USA,2023-01-15 10:00:00,1,,\n")))
+        upload.start()
+
+        try:
+            deadline = time.monotonic() + 10
+            while self._partitions() != ['transaction_y2023m01']:
+                self.assertLess(time.monotonic(), deadline, "partition was never committed")
+                time.sleep(0.05)
+
+            # Fails on lock_timeout if the import still holds the parent table
+            with self.app.app_context():
+                self.assertEqual(db.session.execute(
+                    text('SELECT count(*) FROM "transaction"')).scalar(), 0)
+        finally:
+            holder.rollback()
+            holder.close()
+            upload.join()
+
+        self.assertEqual(responses[0].status_code, 200, responses[0].data)
+
+    def test_concurrent_imports_create_same_partitions(self):
+        """Concurrent imports into the same new months should all succeed"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = []
+            for f in range(4):
+                path = os.path.join(tmpdir, f'part{f}.csv')
+                with open(path, 'wb') as out:
+                    out.write(CSV_HEADER)
+                    for i in range(500):
+                        # Users in a different order per file
+                        user_id = (i * (f + 1)) % 20
+                        out.write(f"{f * 100000 + i},10.00,USD,USA,"
+                                  f"2023-0{1 + i % 3}-01 10:00:00,{user_id},,\n".encode())
+                paths.append(path)
+
+            result = self.runner.invoke(args=['import-transactions', *paths, '--workers', '4'])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(self._partitions(),
+                         ['transaction_y2023m01', 'transaction_y2023m02', 'transaction_y2023m03'])
+        with self.app.app_context():
+            self.assertEqual(Transaction.query.count(), 2000)
+            self.assertEqual(
+                sum(summary.transaction_count for summary in UserSummary.query.all()), 2000)
+
+    def test_concurrent_imports_with_overlapping_ids(self):
+        """Concurrent imports sharing transaction ids should store each id once"""
+        # Months already exist, imports are not serialized by partition creation
+        self._upload(
+            b"900001,10.00,USD,USA,2023-01-01 09:00:00,1,,\n"
+            b"900002,10.00,USD,USA,2023-02-01 09:00:00,1,,\n"
+            b"900003,10.00,USD,USA,2023-03-01 09:00:00,1,,\n"
+        )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = []
+            for f in range(4):
+                path = os.path.join(tmpdir, f'part{f}.csv')
+                with open(path, 'wb') as out:
+                    out.write(CSV_HEADER)
+                    for i in range(500):
+                        # The first 300 ids are in every file
+                        transaction_id = i if i < 300 else f * 100000 + i
+                        out.write(f"{transaction_id},10.00,USD,USA,"
+                                  f"2023-0{1 + f % 3}-01 10:00:00,{i % 20},,\n".encode())
+                paths.append(path)
+
+            result = self.runner.invoke(args=['import-transactions', *paths, '--workers', '4'])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Done: 1100 transactions imported, 900 rows failed", result.output)
+        with self.app.app_context():
+            self.assertEqual(Transaction.query.count(), 1103)
+            self.assertEqual(db.session.execute(text(
+                'SELECT count(DISTINCT transaction_id) FROM "transaction"')).scalar(), 1103)
+            self.assertEqual(
+                sum(summary.transaction_count for summary in UserSummary.query.all()), 1103)
+
+    def test_time_bounded_queries_prune_partitions(self):
+        """Queries bounded by date should only scan the partitions in the window"""
+        self._upload(
+            b"1,10.00,USD,USA,2023-01-15 10:00:00,1,,\n"
+            b"2,20.00,USD,USA,2023-02-15 10:00:00,1,,\n"
+            b"3,30.00,USD,USA,2023-03-15 10:00:00,1,,\n"
+        )
+
+        with self.app.app_context():
+            plan = "\n".join(db.session.execute(text(
+                "EXPLAIN SELECT * FROM \"transaction\" WHERE date >= '2023-03-01'"
+            )).scalars())
+
+        self.assertIn('transaction_y2023m03', plan)
+        self.assertNotIn('transaction_y2023m01', plan)
+        self.assertNotIn('transaction_y2023m02', plan)
+
+    def test_detect_fraud_marks_partitioned_transactions(self):
+        """Offline detection should flag rows stored in partitions"""
+        self._upload(b"1,6000.00,USD,USA,2023-01-15 10:00:00,1,,\n")
+
+        result = self.runner.invoke(args=['detect-fraud'])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        with self.app.app_context():
+            self.assertTrue(Transaction.query.filter_by(transaction_id=1).first().is_suspicious)
+
+    def test_reimport_rejects_existing_transaction_id(self):
+        """An id that already exists should be rejected even with another date"""
+        self._upload(b"1,10.00,USD,USA,2023-01-01 10:00:00,1,,\n")
+
+        response = self._upload(b"1,10.00,USD,USA,2023-02-01 10:00:00,1,,\n")
+
+        self.assertEqual(response.status_code, 207)
+        with self.app.app_context():
+            self.assertEqual(Transaction.query.count(), 1)
+            self.assertEqual(db.session.get(UserSummary, 1).transaction_count, 1)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_archive_drops_partition_and_month_can_be_reimported(self):
+        """Archived months should be dropped and recreated on a later import"""
+        self._upload(
+            b"1,10.00,USD,USA,2023-01-15 10:00:00,1,,\n"
+            b"2,20.00,USD,USA,2023-02-15 10:00:00,1,,\n"
+        )
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            result = self.runner.invoke(args=[
+                'archive-transactions', '--before', '2023-02', '--output-dir', output_dir])
+
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertTrue(os.path.exists(os.path.join(output_dir, 'transaction_y2023m01.parquet')))
+
+        self.assertEqual(self._partitions(), ['transaction_y2023m02'])
+
+        # A late row for the archived month recreates its partition
+        response = self._upload(b"3,30.00,USD,USA,2023-01-20 10:00:00,1,,\n")
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self._partitions(), ['transaction_y2023m01', 'transaction_y2023m02'])
+
+        # Rebuilt summaries still count the archived row
+        result = self.runner.invoke(args=['rebuild-summaries'])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        with self.app.app_context():
+            self.assertEqual(db.session.get(UserSummary, 1).transaction_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
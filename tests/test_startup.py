@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from app import create_app
+from app.utils.task_executor import shutdown_task_executor
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budget for the self import time of the app's own modules, in microseconds.
+# Flask and SQLAlchemy themselves are excluded, only our code is measured.
+APP_IMPORT_BUDGET_US = 150_000
+
+# Modules that must only be imported when actually used
+LAZY_MODULES = ['requests', 'concurrent.futures.thread', 'pyarrow', 'zstandard']
+
+
+def measure_startup():
+    """
+    Runs `python -X importtime` on the app factory in a fresh interpreter.
+
+    Uses the production (non-testing) path, the one short-lived workers and
+    CLI invocations take, with logs and the database kept out of the repo.
+
+    Returns:
+        dict: Module name to self import time in microseconds.
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env = dict(os.environ,
+                   FLASK_ENV='production',
+                   LOG_DIR=tmpdir,
+                   DATABASE_URL=f"sqlite:///{os.path.join(tmpdir, 'app.db')}")
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', "from app import create_app; create_app()"],
+            cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True
+        )
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = int(self_us)
+    return timings
+
+
+class StartupTestCase(unittest.TestCase):
+    def test_heavy_modules_are_not_imported(self):
+        """Building the app should not import modules only needed on demand"""
+        timings = measure_startup()
+        for module in LAZY_MODULES:
+            self.assertNotIn(module, timings)
+
+    def test_app_import_time_budget(self):
+        """The app's own modules should import within the budget"""
+        timings = measure_startup()
+        app_us = sum(us for name, us in timings.items()
+                     if name == 'app' or name.startswith('app.'))
+        self.assertLess(app_us, APP_IMPORT_BUDGET_US)
+
+    def test_task_executor_created_on_first_task(self):
+        """The executor should only start when a task is dispatched"""
+        app = create_app(testing=True)
+        self.assertNotIn('task_executor', app.extensions)
+
+        with patch('app.routes.forward_to_process_fraud'):
+            response = app.test_client().post('/tasks', json={"transaction_id": 1})
+
+        self.assertEqual(response.status_code, 202)
+        self.assertIn('task_executor', app.extensions)
+        shutdown_task_executor(app)
+
+
+if __name__ == '__main__':
+    unittest.main()
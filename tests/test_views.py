@@ -40,6 +40,93 @@ class UploadFileViewTestCase(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn(b'transactions imported successfully', response.data)
 
+    def test_post_upload_compressed_csv(self):
+        """Should detect gzip, bz2 and zstd uploads by content and import them"""
+        import bz2
+        import gzip
+        import zstandard
+
+        content = (
+            b"transaction_id,amount,currency,locantion_country,timestamp,user_id,is_suspicious,reason\n"
+            b"1000,120.00,USD,USA,2023-01-01 10:00:00,1,,\n"
+        )
+        compressors = {
+            'gzip': gzip.compress,
+            'bz2': bz2.compress,
+            'zstd': zstandard.ZstdCompressor().compress,
+        }
+
+        for offset, (name, compress) in enumerate(compressors.items()):
+            with self.subTest(compression=name):
+                payload = compress(content.replace(b"1000", str(1000 + offset).encode()))
+                # File name deliberately carries no extension hint
+                data = {'file': (io.BytesIO(payload), 'upload.bin')}
+                response = self.client.post('/upload', data=data, content_type='multipart/form-data')
+                self.assertEqual(response.status_code, 200)
+                self.assertIn(b'1 transactions imported successfully', response.data)
+
+    def test_post_upload_rejects_existing_transaction_id(self):
+        """Should reject a re-imported transaction_id even when the date differs"""
+        from sqlalchemy.exc import IntegrityError
+        from datetime import datetime
+        from app.models import Transaction, UserSummary
+
+        header = b"transaction_id,amount,currency,country,timestamp,user_id,is_suspicious,reason\n"
+        first = {'file': (io.BytesIO(header + b"1,10.00,USD,USA,2023-01-01 10:00:00,1,,\n"), 'a.csv')}
+        second = {'file': (io.BytesIO(header + b"1,10.00,USD,USA,2023-02-01 10:00:00,1,,\n"), 'b.csv')}
+
+        self.client.post('/upload', data=first, content_type='multipart/form-data')
+        response = self.client.post('/upload', data=second, content_type='multipart/form-data')
+
+        self.assertEqual(response.status_code, 207)
+        self.assertIn(b'0 transactions imported. 1 rows failed.', response.data)
+
+        with self.app.app_context():
+            self.assertEqual(Transaction.query.count(), 1)
+            self.assertEqual(db.session.get(UserSummary, 1).transaction_count, 1)
+
+            # The database enforces it too on SQLite
+            db.session.add(Transaction(transaction_id=1, user_id=1, amount=1.0,
+                                       date=datetime(2023, 3, 1)))
+            with self.assertRaises(IntegrityError):
+                db.session.commit()
+            db.session.rollback()
+
+    def test_import_commits_in_chunks(self):
+        """Rows should be committed chunk by chunk, a failed file can be imported again"""
+        from app.models import Transaction
+        from app.services import transaction_importer
+
+        content = (
+            b"transaction_id,amount,currency,country,timestamp,user_id,is_suspicious,reason\n"
+            + b"".join(f"{i},10.00,USD,USA,2023-01-01 10:0{i}:00,1,,\n".encode() for i in range(1, 6))
+        )
+        original_apply = transaction_importer.apply_imported_transactions
+        chunks = []
+
+        def failing_apply(transactions):
+            chunks.append(len(transactions))
+            if len(chunks) == 3:
+                raise Exception("Simulated failure")
+            original_apply(transactions)
+
+        with self.app.app_context():
+            with patch.object(transaction_importer, 'apply_imported_transactions',
+                              side_effect=failing_apply):
+                with self.assertRaises(RuntimeError):
+                    transaction_importer.import_transactions_from_csv(
+                        io.BytesIO(content), chunk_size=2)
+
+            self.assertEqual(chunks, [2, 2, 1])
+            self.assertEqual(Transaction.query.count(), 4)
+
+            imported, errors = transaction_importer.import_transactions_from_csv(
+                io.BytesIO(content), chunk_size=2)
+
+            self.assertEqual(imported, 1)
+            self.assertEqual([error[1] for error in errors],
+                             [f"Transaction already exists: {i}" for i in range(1, 5)])
+
     def test_post_upload_partial_success(self):
         """Should return 207 if some rows fail and some succeed"""
         mixed_csv = io.BytesIO(
@@ -75,6 +162,22 @@ class UploadFileViewTestCase(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn(b"5 suspicious transactions detected", response.data)
 
+    @patch('app.routes.detect_fraudulent_transactions')
+    def test_detect_fraud_since(self, mock_detect_fraudulent_transactions):
+        """
+        Test that /detect-fraud forwards the `since` window and rejects bad dates.
+        """
+        from datetime import datetime
+
+        mock_detect_fraudulent_transactions.return_value = 0
+
+        response = self.client.post('/detect-fraud?since=2025-04-01 00:00:00')
+        self.assertEqual(response.status_code, 200)
+        mock_detect_fraudulent_transactions.assert_called_once_with(since=datetime(2025, 4, 1))
+
+        response = self.client.post('/detect-fraud?since=yesterday')
+        self.assertEqual(response.status_code, 400)
+
     def test_detect_fraud_invalid_method(self):
         """
         Ensure GET is not allowed on /detect-fraud.
@@ -134,5 +237,213 @@ class UploadFileViewTestCase(unittest.TestCase):
 
         self.assertEqual(response.status_code, 200)
 
+
+class ResultsReadViewTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _upload(self, content):
+        data = {'file': (io.BytesIO(content), 'transactions.csv')}
+        return self.client.post('/upload', data=data, content_type='multipart/form-data')
+
+    def _flag(self, transaction_id, user_id, reason, date):
+        return self.client.post('/process-fraud', json={
+            "transaction_id": transaction_id,
+            "user_id": user_id,
+            "reason": reason,
+            "date": date
+        })
+
+    def test_import_maintains_user_summary(self):
+        """Imports should incrementally update counts, totals and last country"""
+        self._upload(
+            b"transaction_id,amount,currency,country,timestamp,user_id,is_suspicious,reason\n"
+            b"1,100.00,USD,USA,2023-01-01 10:00:00,1,,\n"
+            b"2,50.00,USD,COL,2023-01-01 11:00:00,1,,\n"
+        )
+        self._upload(
+            b"transaction_id,amount,currency,country,timestamp,user_id,is_suspicious,reason\n"
+            b"3,25.00,USD,BRA,2022-12-31 09:00:00,1,,\n"
+        )
+
+        response = self.client.get('/users/1/summary')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["transaction_count"], 3)
+        self.assertEqual(response.json["total_amount"], 175.0)
+        self.assertEqual(response.json["last_country"], "COL")
+        self.assertEqual(response.json["last_transaction_at"], "2023-01-01 11:00:00")
+        self.assertEqual(response.json["flag_count"], 0)
+
+    def test_summary_conditional_get(self):
+        """Should return 304 until the summary changes"""
+        self._upload(
+            b"transaction_id,amount,currency,country,timestamp,user_id,is_suspicious,reason\n"
+            b"1,100.00,USD,USA,2023-01-01 10:00:00,1,,\n"
+        )
+        etag = self.client.get('/users/1/summary').headers['ETag']
+
+        response = self.client.get('/users/1/summary', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        self._flag(1, 1, "Test reason", "2023-01-01 10:00:00")
+
+        response = self.client.get('/users/1/summary', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["flag_count"], 1)
+
+    def test_summary_insert_race_falls_back_to_update(self):
+        """A summary created concurrently should be incremented, not fail the import"""
+        from unittest.mock import MagicMock
+        from app.services import user_summary
+
+        self._upload(
+            b"transaction_id,amount,currency,country,timestamp,user_id,is_suspicious,reason\n"
+            b"1,100.00,USD,USA,2023-01-01 10:00:00,1,,\n"
+        )
+
+        with self.app.app_context():
+            original_execute = db.session.execute
+            calls = []
+
+            def racing_execute(statement, *args, **kwargs):
+                calls.append(statement)
+                if len(calls) == 1:
+                    # Pretend the row did not exist yet when the UPDATE ran
+                    return MagicMock(rowcount=0)
+                return original_execute(statement, *args, **kwargs)
+
+            with patch.object(db.session, 'execute', side_effect=racing_execute):
+                user_summary.increment_flag_count(1)
+            db.session.commit()
+
+        response = self.client.get('/users/1/summary')
+        self.assertEqual(response.json["transaction_count"], 1)
+        self.assertEqual(response.json["flag_count"], 1)
+
+    def test_summary_unknown_user(self):
+        """Should return 404 when no summary exists"""
+        response = self.client.get('/users/999/summary')
+        self.assertEqual(response.status_code, 404)
+
+    def test_suspicious_keyset_pagination(self):
+        """Should walk all flags newest first without duplicates"""
+        for i in range(5):
+            self._flag(i, 1, "Test reason", f"2023-01-01 10:0{i}:00")
+        self._flag(10, 2, "Other reason", "2023-01-01 10:09:00")
+
+        seen = []
+        cursor = None
+        while True:
+            query = {'user_id': 1, 'limit': 2}
+            if cursor:
+                query['cursor'] = cursor
+            response = self.client.get('/suspicious-transactions', query_string=query)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(item["transaction_id"] for item in response.json["items"])
+            cursor = response.json["next_cursor"]
+            if not cursor:
+                break
+
+        self.assertEqual(seen, [4, 3, 2, 1, 0])
+
+    def test_suspicious_pagination_keeps_microseconds(self):
+        """Rows in the same second as the cursor row should not be skipped"""
+        from datetime import datetime
+        from app.models import SuspiciousTransaction
+
+        with self.app.app_context():
+            for i in range(4):
+                # Later microseconds get lower ids, the id tiebreak alone is not enough
+                db.session.add(SuspiciousTransaction(
+                    id=10 - i, transaction_id=i, user_id=1, reason="Test reason",
+                    timestamp=datetime(2023, 1, 1, 10, 0, 0, 1000 * i)))
+            db.session.commit()
+
+        seen = []
+        cursor = None
+        while True:
+            query = {'limit': 1}
+            if cursor:
+                query['cursor'] = cursor
+            response = self.client.get('/suspicious-transactions', query_string=query)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(item["transaction_id"] for item in response.json["items"])
+            cursor = response.json["next_cursor"]
+            if not cursor:
+                break
+
+        self.assertEqual(seen, [3, 2, 1, 0])
+
+    def test_suspicious_filters(self):
+        """Should filter by reason and time range"""
+        self._flag(1, 1, "Reason A", "2023-01-01 10:00:00")
+        self._flag(2, 1, "Reason B", "2023-01-02 10:00:00")
+        self._flag(3, 2, "Reason A", "2023-01-03 10:00:00")
+
+        response = self.client.get('/suspicious-transactions', query_string={
+            'reason': 'Reason A',
+            'since': '2023-01-02 00:00:00',
+            'until': '2023-01-04 00:00:00'
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["transaction_id"] for item in response.json["items"]], [3])
+
+    def test_suspicious_conditional_get(self):
+        """Should return 304 until a new flag is stored"""
+        self._flag(1, 1, "Test reason", "2023-01-01 10:00:00")
+        etag = self.client.get('/suspicious-transactions').headers['ETag']
+
+        with patch('app.routes.get_suspicious_page') as mock_page:
+            response = self.client.get('/suspicious-transactions', headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 304)
+            mock_page.assert_not_called()
+
+        self._flag(2, 1, "Test reason", "2023-01-01 10:01:00")
+        response = self.client.get('/suspicious-transactions', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json["items"]), 2)
+
+    def test_suspicious_version_ignores_flag_id_order(self):
+        """A flag committed after one with a higher id should still change the ETag"""
+        from datetime import datetime
+        from app.models import SuspiciousTransaction
+        from app.services.result_reader import bump_results_version
+
+        def store_flag(flag_id):
+            # What a concurrent writer commits, IDs are assigned before commit
+            with self.app.app_context():
+                db.session.add(SuspiciousTransaction(
+                    id=flag_id, transaction_id=flag_id, user_id=1, reason="Test reason",
+                    timestamp=datetime(2023, 1, 1, 10, 0)))
+                bump_results_version()
+                db.session.commit()
+
+        store_flag(11)
+        etag = self.client.get('/suspicious-transactions').headers['ETag']
+
+        store_flag(10)
+        response = self.client.get('/suspicious-transactions', headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["id"] for item in response.json["items"]], [11, 10])
+
+    def test_suspicious_invalid_parameters(self):
+        """Should return 400 for malformed parameters"""
+        for query in ({'cursor': 'not-a-cursor'}, {'since': '2023-01-01'},
+                      {'limit': 0}, {'user_id': 'abc'}):
+            response = self.client.get('/suspicious-transactions', query_string=query)
+            self.assertEqual(response.status_code, 400)
+
 if __name__ == '__main__':
     unittest.main()